@@ -6,9 +6,21 @@ Flask application for displaying Ceph cluster information collected by get_ceph_
 
 import os
 import re
+import sys
+import csv
 import glob
+import hashlib
 import configparser
-from flask import Flask, render_template, jsonify
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, render_template, jsonify, request
+
+# orjson is optional; it serializes the API payloads several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Read configuration
 config = configparser.ConfigParser()
@@ -22,152 +34,289 @@ else:
 APP_PORT = config.getint('app', 'port', fallback=54321)
 APP_HOST = config.get('app', 'host', fallback='0.0.0.0')
 APP_DEBUG = config.getboolean('app', 'debug', fallback=True)
+APP_WORKERS = config.getint('app', 'workers', fallback=4)
+APP_THREADS = config.getint('app', 'threads', fallback=8)
 
 app = Flask(__name__)
 
+# Titles of the "### " sections of the output files, keyed by the name used in
+# the parsed data. A section matches if its header starts with the title.
+# Code block sections (``` fenced)
+SECTIONS = {
+    'status': 'Cluster Status',
+    'health': 'Cluster Health',
+    'version': 'Ceph Version',
+    'osd_tree': 'OSD Tree',
+    'storage_info': 'All Block Devices',
+    'lvm_info': 'LVM Configuration',
+}
+
+# Markdown table sections
+TABLE_SECTIONS = {
+    'osd_mapping': 'OSD to Device Mapping',
+    'osd_metadata': 'OSD Metadata',
+    'disk_info': 'Detailed Disk Information',
+    'pool_info': 'Pool Usage',
+}
+
+LOCAL_OSDS_SECTION = 'Local OSDs'
+LOCAL_OSDS_PREFIX = b'This server hosts the following OSDs:'
+
+# Matches "<osd id> <class>" at the start of each line of the OSD tree
+OSD_LINE_RE = re.compile(r'^[ \t]*(\d+)[ \t]+(hdd|ssd)[ \t]+', re.MULTILINE)
+
+# Parsed output files: path -> ((mtime_ns, size), parsed data), least recently used first
+_PARSE_CACHE = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+PARSE_CACHE_SIZE = 256
+
+# Output files are named <prefix><server name><suffix>
+OUTPUT_FILE_PREFIX = 'ceph-details-output-'
+OUTPUT_FILE_SUFFIX = '.md'
+
+# Created in the output directory by the launcher while a data fetch is running;
+# holds the launcher's PID
+FETCH_MARKER_FILE = '.fetch-in-progress'
+
+# Output file listing and {server_name: file_path} map, keyed by the output
+# directory's mtime; see find_output_files
+_FILES_CACHE = {'mtime': -1, 'files': [], 'servers': {}}
+
+# Rendered pages and serialized API responses: (view, file set fingerprint) -> body,
+# least recently used first
+_PAGE_CACHE = OrderedDict()
+_PAGE_CACHE_LOCK = threading.Lock()
+PAGE_CACHE_SIZE = 8
+
+# Worker threads used to read and parse the output files concurrently
+_POOL = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4))
+
 def find_output_files():
-    """Find all output files in the output directory."""
+    """
+    Find all output files in the output directory.
+    Returns a sorted list of (server_name, file_path) tuples, cached until the
+    directory's modification time changes, i.e. until files are added, removed or renamed.
+    """
     # Look for files in the output directory
     output_dir = os.path.join(os.path.dirname(__file__), 'output')
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    try:
+        st = os.stat(output_dir)
+    except FileNotFoundError:
+        os.makedirs(output_dir, exist_ok=True)
+        st = os.stat(output_dir)
+    
+    if st.st_mtime_ns == _FILES_CACHE['mtime']:
+        return _FILES_CACHE['files']
+    
+    # Get all markdown files, deriving the server name from the file name once
+    file_pattern = os.path.join(output_dir, f'{OUTPUT_FILE_PREFIX}*{OUTPUT_FILE_SUFFIX}')
+    files = [(os.path.basename(file_path)[len(OUTPUT_FILE_PREFIX):-len(OUTPUT_FILE_SUFFIX)], file_path)
+             for file_path in sorted(glob.glob(file_pattern))]
     
-    # Get all markdown files
-    file_pattern = os.path.join(output_dir, 'ceph-details-output-*.md')
-    return sorted(glob.glob(file_pattern))
+    # Store the listing before its mtime so a concurrent reader never pairs
+    # the new mtime with the old listing
+    _FILES_CACHE['servers'] = dict(files)
+    _FILES_CACHE['files'] = files
+    _FILES_CACHE['mtime'] = st.st_mtime_ns
+    return files
 
-def parse_output_file(file_path):
-    """Parse a single output file and extract relevant information."""
-    with open(file_path, 'r') as f:
-        content = f.read()
+def find_server_file(server_name):
+    """Return the output file path for the named server, or None if there is none."""
+    # Refreshes the cached listing if the output directory changed
+    find_output_files()
+    return _FILES_CACHE['servers'].get(server_name)
+
+def fileset_fingerprint(output_files):
+    """Return a digest of the paths, modification times and sizes of a set of output files."""
+    h = hashlib.blake2b(digest_size=16)
+    for _, path in output_files:
+        st = os.stat(path)
+        h.update(path.encode())
+        h.update(st.st_mtime_ns.to_bytes(8, 'little'))
+        h.update(st.st_size.to_bytes(8, 'little'))
+    return h.hexdigest()
+
+def cached_page(view, output_files, render, mimetype='text/html'):
+    """
+    Serve a response body rendered from the output files, with the file set fingerprint as ETag.
+    render() is only called when no body was rendered yet for the current files.
+    """
+    fingerprint = fileset_fingerprint(output_files)
+    key = (view, fingerprint)
+    
+    with _PAGE_CACHE_LOCK:
+        body = _PAGE_CACHE.get(key)
+        if body is not None:
+            _PAGE_CACHE.move_to_end(key)
+    
+    if body is None:
+        body = render()
+        with _PAGE_CACHE_LOCK:
+            _PAGE_CACHE[key] = body
+            if len(_PAGE_CACHE) > PAGE_CACHE_SIZE:
+                _PAGE_CACHE.popitem(last=False)
+    
+    response = app.response_class(body, mimetype=mimetype)
+    response.set_etag(fingerprint)
+    return response.make_conditional(request)
+
+def dump_json(data):
+    """Serialize API data to JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return app.json.dumps(data)
+
+def decode(data):
+    """Decode bytes read from an output file, replacing invalid UTF-8."""
+    return data.decode('utf-8', 'replace')
+
+def split_sections(content):
+    """
+    Index the '### ' headers of the raw bytes of an output file
+    Returns a {header: (start, end)} dict of decoded headers and body offsets
+    """
+    sections = {}
+    
+    if content[:4] == b'### ':
+        start = 4
+    else:
+        start = content.find(b'\n### ')
+        start = start + 5 if start != -1 else -1
+    
+    while start != -1:
+        header_end = content.find(b'\n', start)
+        if header_end == -1:
+            header_end = len(content)
+        next_header = content.find(b'\n### ', header_end)
+        body_end = next_header if next_header != -1 else len(content)
+        
+        # Keep the first occurrence of a header
+        sections.setdefault(decode(content[start:header_end].strip()), (header_end + 1, body_end))
+        start = next_header + 5 if next_header != -1 else -1
+    
+    return sections
+
+def get_section(content, sections, title):
+    """Return the (bytes) body of the first section whose header starts with title, or None."""
+    for header, (start, end) in sections.items():
+        if header.startswith(title):
+            return content[start:end]
+    return None
+
+def extract_code_block(body):
+    """Return the decoded, stripped contents of the ``` fenced block opening a section body, or None."""
+    if body is None:
+        return None
+    
+    body = body.lstrip()
+    if not body.startswith(b'```'):
+        return None
+    
+    block, fence, _ = body[3:].partition(b'```')
+    return decode(block.strip()) if fence else None
+
+def parse_table(body):
+    """Convert the first markdown table in a section body into a list of row dictionaries."""
+    rows_data = []
+    if body is None:
+        return rows_data
+    
+    # Collect the consecutive '|' lines of the first table
+    table = []
+    for line in body.split(b'\n'):
+        if line.startswith(b'|'):
+            table.append(decode(line))
+        elif table:
+            break
+    
+    # Need a header row, a separator row and at least one data row
+    if len(table) < 3:
+        return rows_data
+    
+    headers = [h.strip() for h in table[0][1:].split('|')]
+    
+    # Split the data rows with the C csv reader; QUOTE_NONE keeps quotes in
+    # cells as literal text, exactly like splitting on '|'
+    reader = csv.reader(table[2:], delimiter='|', quoting=csv.QUOTE_NONE)
+    rows_data = [{h: c.strip() for h, c in zip(headers, row[1:len(headers)+1])}
+                 for row in reader if len(row) > len(headers)]
+    
+    return rows_data
+
+def parse_output_file(server_name, file_path):
+    """
+    Parse a single output file and extract relevant information.
+    Results are cached until the file's modification time or size changes.
+    """
+    st = os.stat(file_path)
+    signature = (st.st_mtime_ns, st.st_size)
     
-    # Extract server name from filename
-    server_name = os.path.basename(file_path).replace('ceph-details-output-', '').replace('.md', '')
+    with _PARSE_CACHE_LOCK:
+        cached = _PARSE_CACHE.get(file_path)
+        if cached and cached[0] == signature:
+            _PARSE_CACHE.move_to_end(file_path)
+            return cached[1]
     
-    # Extract sections using regular expressions
-    status_match = re.search(r'### Cluster Status\s*```\s*(.*?)\s*```', content, re.DOTALL)
-    status = status_match.group(1) if status_match else "Not available"
+    parsed_data = _parse_output_file(server_name, file_path)
     
-    health_match = re.search(r'### Cluster Health\s*```\s*(.*?)\s*```', content, re.DOTALL)
-    health = health_match.group(1) if health_match else "Not available"
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[file_path] = (signature, parsed_data)
+        _PARSE_CACHE.move_to_end(file_path)
+        if len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
     
-    version_match = re.search(r'### Ceph Version\s*```\s*(.*?)\s*```', content, re.DOTALL)
-    version = version_match.group(1) if version_match else "Not available"
+    return parsed_data
+
+def parse_output_files(output_files):
+    """Parse a list of (server_name, file_path) output files concurrently, preserving order."""
+    return list(_POOL.map(lambda output_file: parse_output_file(*output_file), output_files))
+
+def _parse_output_file(server_name, file_path):
+    """Read and parse a single output file, bypassing the cache."""
+    # Read the whole file rather than mapping it: the fetch rewrites output files
+    # while the dashboard is serving, and a mapped file that gets truncated
+    # crashes the process on the next access
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    return parse_content(server_name, content)
+
+def parse_content(server_name, content):
+    """Extract the dashboard data from the raw bytes of an output file."""
+    # Index the sections of the file in a single pass
+    sections = split_sections(content)
+    
+    parsed_data = {'server_name': server_name}
     
-    # Extract OSD information
-    osd_tree_match = re.search(r'### OSD Tree\s*```\s*(.*?)\s*```', content, re.DOTALL)
-    osd_tree = osd_tree_match.group(1) if osd_tree_match else "Not available"
+    # Extract code block sections
+    for key, title in SECTIONS.items():
+        block = extract_code_block(get_section(content, sections, title))
+        parsed_data[key] = block if block is not None else "Not available"
     
     # Extract local OSDs
-    local_osds_match = re.search(r'### Local OSDs\s*This server hosts the following OSDs: (.*?)\n', content)
-    local_osds = local_osds_match.group(1) if local_osds_match else "None found"
+    parsed_data['local_osds'] = "None found"
+    local_osds_body = get_section(content, sections, LOCAL_OSDS_SECTION)
+    if local_osds_body is not None:
+        first_line = local_osds_body.lstrip().partition(b'\n')[0]
+        if first_line.startswith(LOCAL_OSDS_PREFIX):
+            parsed_data['local_osds'] = decode(first_line[len(LOCAL_OSDS_PREFIX):].strip())
     
-    # Extract OSD device mapping
-    osd_mapping_match = re.search(r'### OSD to Device Mapping.*?\n.*?\n\|(.*?)\n\|(.*?)\n((?:\|.*\n)+)', content, re.DOTALL)
-    osd_mapping = []
+    # Extract table sections
+    for key, title in TABLE_SECTIONS.items():
+        parsed_data[key] = parse_table(get_section(content, sections, title))
     
-    if osd_mapping_match:
-        headers = [h.strip() for h in osd_mapping_match.group(1).split('|')]
-        rows = osd_mapping_match.group(3).strip().split('\n')
-        
-        for row in rows:
-            columns = [col.strip() for col in row.split('|')]
-            if len(columns) > len(headers):
-                osd_data = {headers[i]: columns[i+1] for i in range(len(headers))}
-                osd_mapping.append(osd_data)
-    
-    # Extract OSD metadata
-    osd_metadata_match = re.search(r'### OSD Metadata.*?\n.*?\n\|(.*?)\n\|(.*?)\n((?:\|.*\n)+)', content, re.DOTALL)
-    osd_metadata = []
-    
-    if osd_metadata_match:
-        headers = [h.strip() for h in osd_metadata_match.group(1).split('|')]
-        rows = osd_metadata_match.group(3).strip().split('\n')
-        
-        for row in rows:
-            columns = [col.strip() for col in row.split('|')]
-            if len(columns) > len(headers):
-                osd_data = {headers[i]: columns[i+1] for i in range(len(headers))}
-                osd_metadata.append(osd_data)
-    
-    # Extract disk information
-    disk_info_match = re.search(r'### Detailed Disk Information\s*\n\s*\n\|(.*?)\n\|(.*?)\n((?:\|.*\n)+)', content, re.DOTALL)
-    disk_info = []
-    
-    if disk_info_match:
-        headers = [h.strip() for h in disk_info_match.group(1).split('|')]
-        rows = disk_info_match.group(3).strip().split('\n')
-        
-        for row in rows:
-            columns = [col.strip() for col in row.split('|')]
-            if len(columns) > len(headers):
-                disk_data = {headers[i]: columns[i+1] for i in range(len(headers))}
-                disk_info.append(disk_data)
-    
-    # Extract pool information
-    pool_info_match = re.search(r'### Pool Usage\s*\n\|(.*?)\n\|(.*?)\n((?:\|.*\n)+)', content, re.DOTALL)
-    pool_info = []
-    
-    if pool_info_match:
-        headers = [h.strip() for h in pool_info_match.group(1).split('|')]
-        rows = pool_info_match.group(3).strip().split('\n')
-        
-        for row in rows:
-            columns = [col.strip() for col in row.split('|')]
-            if len(columns) > len(headers):
-                pool_data = {headers[i]: columns[i+1] for i in range(len(headers))}
-                pool_info.append(pool_data)
-    
-    # Extract system storage information
-    storage_info_match = re.search(r'### All Block Devices\s*```\s*(.*?)\s*```', content, re.DOTALL)
-    storage_info = storage_info_match.group(1) if storage_info_match else "Not available"
-    
-    # Extract LVM configuration
-    lvm_info_match = re.search(r'### LVM Configuration\s*```\s*(.*?)\s*```', content, re.DOTALL)
-    lvm_info = lvm_info_match.group(1) if lvm_info_match else "Not available"
-    
-    return {
-        'server_name': server_name,
-        'status': status,
-        'health': health,
-        'version': version,
-        'osd_tree': osd_tree,
-        'local_osds': local_osds,
-        'osd_mapping': osd_mapping,
-        'osd_metadata': osd_metadata,
-        'disk_info': disk_info,
-        'pool_info': pool_info,
-        'storage_info': storage_info,
-        'lvm_info': lvm_info
-    }
-
-def extract_osd_types_from_tree(output_files):
+    return parsed_data
+
+def extract_osd_types_from_tree(parsed_files):
     """
-    Extract OSD types (HDD/SSD) from the OSD Tree section
+    Extract OSD types (HDD/SSD) from the OSD Tree section of parsed output files
     Returns a dictionary mapping OSD IDs to their types
     """
     osd_types = {}
     
-    for file_path in output_files:
-        try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            # Find the OSD Tree section
-            osd_tree_match = re.search(r'### OSD Tree\s*```\s*(.*?)\s*```', content, re.DOTALL)
-            
-            if osd_tree_match:
-                tree_text = osd_tree_match.group(1)
-                # Parse the tree to extract OSD IDs and their classes
-                for line in tree_text.splitlines():
-                    # Look for lines with osd.X that include class information
-                    osd_match = re.search(r'(\d+)\s+(hdd|ssd)\s+', line)
-                    if osd_match:
-                        osd_id = osd_match.group(1)
-                        osd_class = osd_match.group(2)
-                        osd_types[osd_id] = osd_class
-        except Exception as e:
-            print(f"Error extracting OSD types from {file_path}: {str(e)}")
+    for parsed_data in parsed_files:
+        # Parse the tree to extract OSD IDs and their classes in a single scan
+        for osd_match in OSD_LINE_RE.finditer(parsed_data['osd_tree']):
+            osd_types[osd_match.group(1)] = osd_match.group(2)
     
     return osd_types
 
@@ -178,177 +327,207 @@ def parse_osd_by_server_and_type(output_files):
     """
     servers_data = {}
     
-    # First, extract OSD types from the OSD Tree (CRUSH map)
-    osd_types = extract_osd_types_from_tree(output_files)
+    # Parse the files concurrently. This reuses the (cached) parse of the whole
+    # file, so each file is read and each section extracted only once
+    futures = [_POOL.submit(parse_output_file, server_name, file_path)
+               for server_name, file_path in output_files]
     
-    for file_path in output_files:
+    parsed_files = []
+    for (_, file_path), future in zip(output_files, futures):
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            # Extract server name from filename
-            server_name = os.path.basename(file_path).replace('ceph-details-output-', '').replace('.md', '')
-            
-            # Initialize server data structure
-            if server_name not in servers_data:
-                servers_data[server_name] = {
-                    'hdd_osds': [],
-                    'ssd_osds': [],
-                    'unknown_osds': []
-                }
-            
-            # Get list of local OSDs for this server
-            local_osds = []
-            local_osds_match = re.search(r'### Local OSDs\s*This server hosts the following OSDs:\s*(.*?)\n', content)
-            if local_osds_match:
-                local_osds_str = local_osds_match.group(1).replace(' ', '')
-                local_osds = [osd.strip() for osd in local_osds_str.split(',') if osd.strip()]
-            
-            # Process data for each local OSD
-            for osd_id in local_osds:
-                # Initialize with default values
-                osd_data = {
-                    'osd_id': osd_id,
-                    'device_path': "Unknown",
-                    'size': "Unknown",
-                    'model': "Unknown",
-                    'db_device': "Unknown",
-                    'db_size': "N/A",
-                    'wal_device': "Unknown",
-                    'wal_size': "N/A"
-                }
-                
-                # Try to get detailed disk information
-                disk_info_section = re.search(r'### Detailed Disk Information\s*\n\s*\n\|(.*?)\n\|(.*?)\n((?:\|.*\n)+)', content, re.DOTALL)
-                if disk_info_section:
-                    headers = [h.strip() for h in disk_info_section.group(1).split('|') if h.strip()]
-                    rows = disk_info_section.group(3).strip().split('\n')
-                    
-                    for row in rows:
-                        columns = [col.strip() for col in row.split('|') if col.strip()]
-                        if len(columns) >= len(headers):
-                            try:
-                                # Extract OSD ID from the row (should be the first column)
-                                row_osd_id = columns[0]
-                                # Clean up OSD ID if needed
-                                if row_osd_id.isdigit() and row_osd_id == osd_id:
-                                    # Map column indices to headers
-                                    col_map = {headers[i]: columns[i] for i in range(len(headers)) if i < len(columns)}
-                                    
-                                    # Extract values based on header names
-                                    osd_data['device_path'] = col_map.get('Device Path', 'Unknown')
-                                    osd_data['size'] = col_map.get('Size', 'Unknown')
-                                    osd_data['model'] = col_map.get('Model', 'Unknown')
-                                    osd_data['db_device'] = col_map.get('DB Device', 'Unknown')
-                                    osd_data['db_size'] = col_map.get('DB Size', 'N/A')
-                                    osd_data['wal_device'] = col_map.get('WAL Device', 'Unknown')
-                                    osd_data['wal_size'] = col_map.get('WAL Size', 'N/A')
-                                    break
-                            except Exception as e:
-                                print(f"Error processing row for OSD {osd_id}: {str(e)}")
-                                continue
-                
-                # Fall back to metadata section if detailed info not found
-                if osd_data['device_path'] == "Unknown":
-                    meta_section = re.search(r'### OSD Metadata.*?\n.*?\n\|(.*?)\n\|(.*?)\n((?:\|.*\n)+)', content, re.DOTALL)
-                    if meta_section:
-                        headers = [h.strip() for h in meta_section.group(1).split('|') if h.strip()]
-                        rows = meta_section.group(3).strip().split('\n')
-                        
-                        for row in rows:
-                            columns = [col.strip() for col in row.split('|') if col.strip()]
-                            if len(columns) >= len(headers):
-                                row_osd_id = columns[0]
-                                if row_osd_id == osd_id:
-                                    # Map column indices to headers
-                                    col_map = {headers[i]: columns[i] for i in range(len(headers)) if i < len(columns)}
-                                    
-                                    # Update OSD data from metadata
-                                    osd_data['size'] = col_map.get('Size', 'Unknown')
-                                    osd_data['device_path'] = col_map.get('Device Path', 'Unknown')
-                                    if 'DB Path' in col_map:
-                                        db_path = col_map.get('DB Path')
-                                        if db_path != "N/A":
-                                            osd_data['db_device'] = db_path
-                                    if 'WAL Path' in col_map:
-                                        wal_path = col_map.get('WAL Path')
-                                        if wal_path != "N/A":
-                                            osd_data['wal_device'] = wal_path
-                                    break
-                
-                # Use OSD type from CRUSH map
-                osd_type = osd_types.get(osd_id, 'unknown')
-                
-                # Add OSD to the appropriate category based on the CRUSH map
-                if osd_type == 'hdd':
-                    servers_data[server_name]['hdd_osds'].append(osd_data)
-                elif osd_type == 'ssd':
-                    servers_data[server_name]['ssd_osds'].append(osd_data)
-                else:
-                    servers_data[server_name]['unknown_osds'].append(osd_data)
-            
+            parsed_files.append(future.result())
         except Exception as e:
             print(f"Error parsing file {file_path}: {str(e)}")
             import traceback
             traceback.print_exc()
     
+    # Extract OSD types from the OSD Tree (CRUSH map)
+    osd_types = extract_osd_types_from_tree(parsed_files)
+    
+    for parsed_data in parsed_files:
+        server_name = parsed_data['server_name']
+        
+        # Initialize server data structure
+        if server_name not in servers_data:
+            servers_data[server_name] = {
+                'hdd_osds': [],
+                'ssd_osds': [],
+                'unknown_osds': []
+            }
+        
+        # Get list of local OSDs for this server
+        local_osds = []
+        if parsed_data['local_osds'] != "None found":
+            local_osds_str = parsed_data['local_osds'].replace(' ', '')
+            local_osds = [osd.strip() for osd in local_osds_str.split(',') if osd.strip()]
+        
+        # Index the disk info and metadata rows by OSD ID once per file
+        # (reversed so the first row for an OSD wins, as in a linear scan)
+        disk_info_by_id = {row.get('OSD ID'): row for row in reversed(parsed_data['disk_info'])}
+        osd_metadata_by_id = {row.get('OSD ID'): row for row in reversed(parsed_data['osd_metadata'])}
+        
+        # Process data for each local OSD
+        for osd_id in local_osds:
+            # Initialize with default values
+            osd_data = {
+                'osd_id': osd_id,
+                'device_path': "Unknown",
+                'size': "Unknown",
+                'model': "Unknown",
+                'db_device': "Unknown",
+                'db_size': "N/A",
+                'wal_device': "Unknown",
+                'wal_size': "N/A"
+            }
+            
+            # Try to get detailed disk information
+            row = disk_info_by_id.get(osd_id)
+            if row:
+                osd_data['device_path'] = row.get('Device Path', 'Unknown')
+                osd_data['size'] = row.get('Size', 'Unknown')
+                osd_data['model'] = row.get('Model', 'Unknown')
+                osd_data['db_device'] = row.get('DB Device', 'Unknown')
+                osd_data['db_size'] = row.get('DB Size', 'N/A')
+                osd_data['wal_device'] = row.get('WAL Device', 'Unknown')
+                osd_data['wal_size'] = row.get('WAL Size', 'N/A')
+            
+            # Fall back to metadata section if detailed info not found
+            row = osd_metadata_by_id.get(osd_id)
+            if osd_data['device_path'] == "Unknown" and row:
+                # Update OSD data from metadata
+                osd_data['size'] = row.get('Size', 'Unknown')
+                osd_data['device_path'] = row.get('Device Path', 'Unknown')
+                if row.get('DB Path', 'N/A') != "N/A":
+                    osd_data['db_device'] = row['DB Path']
+                if row.get('WAL Path', 'N/A') != "N/A":
+                    osd_data['wal_device'] = row['WAL Path']
+            
+            # Use OSD type from CRUSH map
+            osd_type = osd_types.get(osd_id, 'unknown')
+            
+            # Add OSD to the appropriate category based on the CRUSH map
+            if osd_type == 'hdd':
+                servers_data[server_name]['hdd_osds'].append(osd_data)
+            elif osd_type == 'ssd':
+                servers_data[server_name]['ssd_osds'].append(osd_data)
+            else:
+                servers_data[server_name]['unknown_osds'].append(osd_data)
+    
     return servers_data
 
 @app.route('/')
 def index():
     output_files = find_output_files()
     
-    # Process each file
-    all_data = []
-    for file_path in output_files:
-        parsed_data = parse_output_file(file_path)
-        all_data.append(parsed_data)
+    def render():
+        # Process the files concurrently
+        all_data = parse_output_files(output_files)
+        
+        # Render the template with the data
+        return render_template('index.html', 
+                              all_data=all_data, 
+                              dashboard_links=[
+                                  {'name': 'Home', 'url': '/'},
+                                  {'name': 'OSDs by Server & Type', 'url': '/osds-by-server'}
+                              ])
     
-    # Render the template with the data
-    return render_template('index.html', 
-                          all_data=all_data, 
-                          dashboard_links=[
-                              {'name': 'Home', 'url': '/'},
-                              {'name': 'OSDs by Server & Type', 'url': '/osds-by-server'}
-                          ])
+    return cached_page('index', output_files, render)
 
 @app.route('/osds-by-server')
 def osds_by_server():
     output_files = find_output_files()
-    servers_data = parse_osd_by_server_and_type(output_files)
-    return render_template('osds_by_server.html', servers_data=servers_data)
+    
+    def render():
+        servers_data = parse_osd_by_server_and_type(output_files)
+        return render_template('osds_by_server.html', servers_data=servers_data)
+    
+    return cached_page('osds_by_server', output_files, render)
 
 @app.route('/api/servers')
 def api_servers():
     """API endpoint to get data for all servers."""
     output_files = find_output_files()
     
-    # Process each file
-    all_data = []
-    for file_path in output_files:
-        parsed_data = parse_output_file(file_path)
-        all_data.append(parsed_data)
+    def render():
+        # Process the files concurrently; the serialized JSON is cached with
+        # the same fingerprint as the dashboard pages
+        return dump_json(parse_output_files(output_files))
     
-    return jsonify(all_data)
+    return cached_page('api_servers', output_files, render, mimetype='application/json')
 
 @app.route('/api/server/<server_name>')
 def api_server(server_name):
     """API endpoint to get data for a specific server."""
-    output_files = find_output_files()
-    
     # Find the file for the specified server
-    server_file = None
-    for file_path in output_files:
-        if server_name in file_path:
-            server_file = file_path
-            break
+    server_file = find_server_file(server_name)
     
     if server_file:
-        parsed_data = parse_output_file(server_file)
-        return jsonify(parsed_data)
+        parsed_data = parse_output_file(server_name, server_file)
+        return app.response_class(dump_json(parsed_data), mimetype='application/json')
     else:
         return jsonify({'error': 'Server not found'})
 
+def fetch_in_progress():
+    """
+    Whether the launcher is fetching data: the marker file exists and the process
+    that wrote it is still alive, so a marker left behind by a killed launcher is ignored.
+    """
+    marker = os.path.join(os.path.dirname(__file__), 'output', FETCH_MARKER_FILE)
+    try:
+        with open(marker) as f:
+            pid = int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return False
+    
+    # On Windows os.kill would terminate the process, so trust the marker there
+    if os.name == 'nt':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        pass
+    return True
+
+@app.route('/status')
+def status():
+    """Report whether a data fetch is still running and how many servers have data."""
+    return jsonify({
+        'fetching': fetch_in_progress(),
+        'servers': len(find_output_files()),
+    })
+
+def run_production_server():
+    """
+    Serve the app with gunicorn, using preforked workers that each run a thread pool
+    Returns False if gunicorn is not installed
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+    
+    class DashboardApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{APP_HOST}:{APP_PORT}")
+            self.cfg.set('workers', APP_WORKERS)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', APP_THREADS)
+        
+        def load(self):
+            return app
+    
+    DashboardApplication().run()
+    return True
+
 if __name__ == '__main__':
-    print(f"Starting Ceph Dashboard on port {APP_PORT}")
-    app.run(debug=APP_DEBUG, host=APP_HOST, port=APP_PORT)
\ No newline at end of file
+    if '--dev' in sys.argv[1:]:
+        print(f"Starting Ceph Dashboard development server on port {APP_PORT}")
+        app.run(debug=APP_DEBUG, host=APP_HOST, port=APP_PORT)
+    else:
+        print(f"Starting Ceph Dashboard on port {APP_PORT}")
+        if not run_production_server():
+            print("Warning: gunicorn not installed, falling back to the threaded development server.")
+            app.run(host=APP_HOST, port=APP_PORT, threaded=True)
\ No newline at end of file
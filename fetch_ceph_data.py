@@ -7,90 +7,389 @@ to the local output directory.
 
 import os
 import sys
+import logging
+import threading
 import paramiko
 import configparser
 import getpass
 from pathlib import Path
 import time
-import re
+import shlex
+import socket
+import stat
+import fnmatch
+import posixpath
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger("ceph_fetch")
+
+# SFTP channel window size for downloading the output files
+SFTP_WINDOW_SIZE = 4 * 1024 * 1024
+
+# Set when the fetch is interrupted; workers stop at the next check and the
+# SSH clients of the running ones are closed, which unblocks their reads
+_CANCELLED = threading.Event()
+_ACTIVE_CLIENTS = set()
+_ACTIVE_CLIENTS_LOCK = threading.Lock()
+
+# Bytes of script output kept for error reports
+OUTPUT_TAIL_SIZE = 4096
+
+# Names of the file written by get_ceph_info.sh; older script versions wrote ceph-mapping.md
+OUTPUT_FILE_PATTERNS = ("ceph-mapping.md", "ceph-details-output*.md")
+
+# Output files larger than this are downloaded as parallel byte ranges
+PARALLEL_DOWNLOAD_MIN_SIZE = 16 * 1024 * 1024
+PARALLEL_DOWNLOAD_STREAMS = 4
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
 def read_config(config_path):
     """Read configuration file and return config object."""
-    if not os.path.exists(config_path):
-        print(f"Error: Config file {config_path} not found.")
-        sys.exit(1)
-    
     config = configparser.ConfigParser()
-    config.read(config_path)
+    try:
+        with open(config_path, 'r') as f:
+            config.read_file(f)
+    except FileNotFoundError:
+        logger.error("Error: Config file %s not found.", config_path)
+        sys.exit(1)
     
     return config
 
 def validate_config(config):
-    """Validate that the config file has required sections and options."""
-    required_sections = ['ssh', 'servers', 'paths']
-    required_ssh_options = ['username', 'key_file']
-    required_paths_options = ['remote_script_path']
+    """Validate that the config file has required sections and options, reporting everything missing at once."""
+    required_sections = {'ssh', 'servers', 'paths'}
+    required_options = {
+        'ssh': {'username', 'key_file'},
+        'paths': {'remote_script_path'},
+    }
     
-    for section in required_sections:
-        if section not in config:
-            print(f"Error: Required section '{section}' missing from config file.")
-            sys.exit(1)
+    errors = []
     
-    for option in required_ssh_options:
-        if option not in config['ssh']:
-            print(f"Error: Required option '{option}' missing from [ssh] section.")
-            sys.exit(1)
-            
-    for option in required_paths_options:
-        if option not in config['paths']:
-            print(f"Error: Required option '{option}' missing from [paths] section.")
-            sys.exit(1)
+    for section in sorted(required_sections - set(config.sections())):
+        errors.append(f"Error: Required section '{section}' missing from config file.")
+    
+    for section, options in required_options.items():
+        if section in config:
+            for option in sorted(options - set(config[section])):
+                errors.append(f"Error: Required option '{option}' missing from [{section}] section.")
     
-    if not config['servers']:
-        print(f"Error: No servers specified in the [servers] section.")
+    if 'servers' in config and not config['servers']:
+        errors.append(f"Error: No servers specified in the [servers] section.")
+    
+    if errors:
+        for error in errors:
+            logger.error(error)
         sys.exit(1)
 
-def wait_for_prompt(channel, timeout=20):
-    """Wait for shell prompt with timeout and better detection."""
-    output = b''
-    start_time = time.time()
+def recv_until(channel, deadline, size=1024):
+    """
+    Block until data arrives on the channel or the deadline (a time.time() value) passes.
+    Returns the received bytes, or None on timeout or if the channel was closed.
+    """
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return None
+    
+    channel.settimeout(remaining)
+    try:
+        chunk = channel.recv(size)
+    except socket.timeout:
+        return None
+    
+    return chunk or None
+
+def _register_client(ssh):
+    """Track a worker's SSH client so an interrupt can close it. Returns False if already cancelled."""
+    with _ACTIVE_CLIENTS_LOCK:
+        if _CANCELLED.is_set():
+            return False
+        _ACTIVE_CLIENTS.add(ssh)
+        return True
+
+def _close_active_clients():
+    """Cancel the fetch and close the SSH clients of all running workers."""
+    with _ACTIVE_CLIENTS_LOCK:
+        _CANCELLED.set()
+        clients = list(_ACTIVE_CLIENTS)
+    for ssh in clients:
+        try:
+            ssh.close()
+        except Exception:
+            pass
+
+def quote_remote_path(path):
+    """Quote a remote path for the shell, leaving a leading ~/ to be expanded."""
+    if path == '~' or path.startswith('~/'):
+        return '~' + (f"/{shlex.quote(path[2:])}" if path[2:] else '')
+    return shlex.quote(path)
+
+def sftp_path(path):
+    """Convert a remote shell path to an SFTP path; SFTP resolves relative paths from the home directory."""
+    if path == '~' or not path:
+        return '.'
+    if path.startswith('~/'):
+        return path[2:]
+    return path
+
+# Key classes to try for each private key file header, most likely first
+KEY_TYPES_BY_HEADER = [
+    (b'OPENSSH', ('Ed25519Key', 'RSAKey', 'ECDSAKey')),
+    (b'RSA', ('RSAKey',)),
+    (b'EC', ('ECDSAKey',)),
+    (b'DSA', ('DSSKey',)),
+]
+
+# Full fallback order when the header does not identify the key type
+KEY_TYPES = ('Ed25519Key', 'RSAKey', 'ECDSAKey', 'DSSKey')
+
+def _load_private_key(key_file, key_password):
+    """Load the SSH private key, determining its type, and return the paramiko.PKey."""
+    # Sniff the key type from the header line so the matching loader is tried first
+    with open(key_file, 'rb') as fh:
+        header = fh.readline()
+    
+    candidates = ()
+    for marker, key_types in KEY_TYPES_BY_HEADER:
+        if marker in header:
+            candidates = key_types
+            break
+    
+    # Unrecognized headers, or a wrong guess, fall back to the remaining types
+    key_types = list(candidates) + [key_type for key_type in KEY_TYPES if key_type not in candidates]
+    for key_type in key_types:
+        # DSSKey is missing from newer paramiko releases
+        key_class = getattr(paramiko, key_type, None)
+        if key_class is None:
+            continue
+        try:
+            return key_class.from_private_key_file(key_file, password=key_password)
+        except paramiko.ssh_exception.SSHException:
+            continue
+    
+    logger.error("Error: Unable to determine the type of the SSH key %s or key is invalid.", key_file)
+    sys.exit(1)
+
+def is_new_file(entry, previous):
+    """Whether a directory entry differs from its listing before the script ran (None if it was absent)."""
+    return previous is None or (entry.st_mtime, entry.st_size) != (previous.st_mtime, previous.st_size)
+
+def download_output_file(transport, sftp, remote_path, local_file):
+    """
+    Download a remote file over SFTP to a temporary file next to local_file,
+    then move it into place, so the dashboard never reads a partial file.
+    """
+    # The .part name does not match the dashboard's output file pattern
+    part_file = f"{local_file}.part"
+    try:
+        _download_file(transport, sftp, remote_path, part_file)
+        os.replace(part_file, local_file)
+    except BaseException:
+        try:
+            os.remove(part_file)
+        except OSError:
+            pass
+        raise
+
+def _download_file(transport, sftp, remote_path, local_file):
+    """
+    Download a remote file over SFTP. Large files are split into byte ranges,
+    each fetched over its own SFTP channel, so a single channel window does not
+    limit the throughput.
+    """
+    size = sftp.stat(remote_path).st_size or 0
+    if size <= PARALLEL_DOWNLOAD_MIN_SIZE:
+        # prefetch pipelines the read requests up to the window size
+        sftp.get(remote_path, local_file, prefetch=True)
+        return
+    
+    # Preallocate the local file so every range can be written in place
+    with open(local_file, 'wb') as f:
+        f.truncate(size)
+    
+    range_size = -(-size // PARALLEL_DOWNLOAD_STREAMS)
     
-    # Common shell prompt patterns
-    prompt_patterns = [
-        b'$ ',        # Basic bash prompt
-        b'> ',        # Some shells
-        b'# ',        # Root prompt
-        b'%',         # zsh prompt
-        b']$ ',       # Common pattern with hostname
-        b':\\S+>',    # Windows command prompt
-        b'~[$#>] '    # Home directory indicators
-    ]
+    def fetch_range(start):
+        end = min(start + range_size, size)
+        range_sftp = paramiko.SFTPClient.from_transport(transport, window_size=SFTP_WINDOW_SIZE)
+        try:
+            range_sftp.get_channel().settimeout(60)
+            with range_sftp.open(remote_path, 'rb') as remote, open(local_file, 'r+b') as local:
+                local.seek(start)
+                for offset in range(start, end, DOWNLOAD_CHUNK_SIZE):
+                    length = min(DOWNLOAD_CHUNK_SIZE, end - offset)
+                    # readv pipelines the reads for the chunk
+                    data = b''.join(remote.readv([(offset, length)]))
+                    if len(data) != length:
+                        raise IOError(f"Short read at offset {offset} of {remote_path}")
+                    local.write(data)
+        finally:
+            range_sftp.close()
+    
+    with ThreadPoolExecutor(max_workers=PARALLEL_DOWNLOAD_STREAMS) as executor:
+        # list() re-raises the first error from any range
+        list(executor.map(fetch_range, range(0, size, range_size)))
+
+def _process_server(server_name, server_ip, username, private_key, sudo_password,
+                    script_dir, script_name, output_dir):
+    """
+    Connect to one server, run the get_ceph_info.sh script, wait for completion,
+    then download the generated output file.
+    Returns a (server_name, success, error_message) tuple.
+    """
+    # Each worker uses its own SSH client, as they are not safe to share between threads
+    ssh = paramiko.SSHClient()
+    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    if not _register_client(ssh):
+        return server_name, False, f"Cancelled before connecting to {server_name}"
     
-    while time.time() - start_time < timeout:
-        if channel.recv_ready():
-            chunk = channel.recv(1024)
+    try:
+        logger.info("Connecting to %s (%s)...", server_name, server_ip)
+        
+        try:
+            # Compress the transport: the markdown output shrinks several times over,
+            # which shortens the download on slow links. Bound every connection
+            # phase so an unresponsive server fails fast
+            ssh.connect(server_ip, username=username, pkey=private_key, timeout=10,
+                        banner_timeout=10, auth_timeout=10, compress=True)
+            # Keepalives surface a dead session while the script is running
+            ssh.get_transport().set_keepalive(30)
+            logger.info("Successfully connected to %s", server_name)
+            # The interrupt may have closed the client while connect was running
+            if _CANCELLED.is_set():
+                return server_name, False, f"Cancelled on {server_name}"
+        except paramiko.ssh_exception.PasswordRequiredException as e:
+            # The configured key is decrypted before the workers start, so this comes
+            # from paramiko falling back to a passphrase-protected default key after
+            # the configured key was rejected
+            return server_name, False, (f"Error connecting to {server_name} ({server_ip}): the configured key was "
+                                        f"not accepted and a fallback key needs a password: {str(e)}")
+        except Exception as e:
+            return server_name, False, f"Error connecting to {server_name} ({server_ip}): {str(e)}"
+        
+        # Open SFTP with a larger window than the default so the download is not
+        # throttled by window updates on high-latency links
+        sftp = paramiko.SFTPClient.from_transport(ssh.get_transport(), window_size=SFTP_WINDOW_SIZE)
+        sftp.get_channel().settimeout(60)
+        sftp_dir = sftp_path(script_dir)
+        
+        # List the script directory before the run: files that are unchanged
+        # afterwards are leftovers from earlier runs, not this run's output
+        try:
+            files_before = {entry.filename: entry for entry in sftp.listdir_attr(sftp_dir)}
+        except IOError:
+            files_before = {}
+        
+        # The script is usually executable after the first run, so only chmod it when needed
+        script_entry = files_before.get(script_name)
+        script_mode = (script_entry.st_mode or 0) if script_entry else 0
+        
+        # Run the script with sudo in a single non-interactive command: change to the
+        # script directory, make the script executable if needed, and let sudo read
+        # the password from stdin (-S) without printing a prompt
+        command = f"sudo -S -p '' ./{shlex.quote(script_name)}"
+        if not script_mode & 0o111:
+            command = f"chmod +x {shlex.quote(script_name)} && {command}"
+        if script_dir:
+            command = f"cd {quote_remote_path(script_dir)} && {command}"
+        
+        logger.info("Running get_ceph_info.sh on %s with sudo (this may take several minutes)...", server_name)
+        channel = ssh.get_transport().open_session()
+        channel.set_combine_stderr(True)
+        channel.exec_command(command)
+        channel.sendall(sudo_password + '\n')
+        channel.shutdown_write()
+        
+        # Drain the output until the command exits, with timeout
+        max_wait_time = 600  # 10 minutes max wait
+        deadline = time.time() + max_wait_time
+        # Only the tail of the output is kept, for error reports
+        output = bytearray()
+        
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        while True:
+            chunk = recv_until(channel, deadline, 4096)
+            if chunk is None:
+                break
+            if debug:
+                logger.debug("Received chunk from %s: %r...", server_name, chunk[:50]) # Show first 50 bytes
             output += chunk
-            print(f"Debug - received: {chunk}")  # Debug output
+            if len(output) > 2 * OUTPUT_TAIL_SIZE:
+                del output[:-OUTPUT_TAIL_SIZE]
+        
+        if _CANCELLED.is_set():
+            return server_name, False, f"Cancelled while running the script on {server_name}"
+        
+        if not channel.eof_received:
+            return server_name, False, (f"Error: Script execution timed out on {server_name} after {max_wait_time} seconds\n"
+                                        f"Last output: {bytes(output[-OUTPUT_TAIL_SIZE:])}")
+        
+        exit_status = channel.recv_exit_status()
+        if exit_status != 0:
+            return server_name, False, (f"Error: Script execution failed on {server_name} with exit status {exit_status}\n"
+                                        f"Last output: {bytes(output[-OUTPUT_TAIL_SIZE:])}")
+        
+        logger.info("Script execution completed on %s", server_name)
+        
+        # Now download the output file using SFTP
+        
+        # Look for output file with more flexible naming
+        logger.info("Searching for output file on %s...", server_name)
+        
+        # Check script directory for output files, listing it over the SFTP
+        # session that is already open instead of running find per pattern
+        found_output_file = False
+        remote_output_path = None
+        
+        try:
+            entries = [entry for entry in sftp.listdir_attr(sftp_dir) if stat.S_ISREG(entry.st_mode or 0)]
+        except Exception as e:
+            logger.error("Error listing %s on %s: %s", script_dir or '.', server_name, e)
+            entries = []
+        
+        # Only consider files the script created or rewrote during this run
+        matches = [entry for entry in entries
+                   if any(fnmatch.fnmatch(entry.filename, pattern) for pattern in OUTPUT_FILE_PATTERNS)
+                   and is_new_file(entry, files_before.get(entry.filename))]
+        if matches:
+            # The newest file is the one the script has just written
+            newest = max(matches, key=lambda entry: entry.st_mtime or 0)
+            remote_output_path = posixpath.join(sftp_dir, newest.filename)
+            found_output_file = True
+            logger.info("Found output file on %s: %s", server_name, remote_output_path)
+        
+        if not found_output_file:
+            return server_name, False, f"Error: Could not find a new output file on {server_name}"
             
-            # Check for shell prompts
-            for pattern in prompt_patterns:
-                if re.search(pattern, output):
-                    return output
-                
-            # Also check for login: or Password: prompts which indicate issues
-            if re.search(b'[Ll]ogin:', output) or re.search(b'[Pp]assword:', output):
-                print(f"Warning: Received login/password prompt which suggests authentication issue")
-                return output
+        local_file = output_dir / f"ceph-details-output-{server_name}.md"
         
-        time.sleep(0.1)
-    
-    print(f"Warning: Timed out waiting for prompt. Last output: {output}")
-    return output
+        try:
+            logger.info("Downloading output file to %s...", local_file)
+            download_output_file(ssh.get_transport(), sftp, remote_output_path, local_file)
+            logger.info("Download complete for %s!", server_name)
+        except FileNotFoundError:
+            return server_name, False, f"Error: Output file not found on {server_name}. Check if the script generated its output file."
+        except Exception as e:
+            return server_name, False, f"Error downloading output file from {server_name}: {str(e)}"
+        
+        return server_name, True, None
+        
+    except Exception as e:
+        return server_name, False, f"Unexpected error with {server_name}: {str(e)}"
+    finally:
+        # Close connections (this also closes the shell channel and SFTP session)
+        try:
+            ssh.close()
+        except:
+            pass
+        with _ACTIVE_CLIENTS_LOCK:
+            _ACTIVE_CLIENTS.discard(ssh)
 
-def execute_remote_script_and_fetch_output(config):
+def execute_remote_script_and_fetch_output(config, on_prompts_done=None):
     """
-    Connect to each server, run the get_ceph_info.sh script,
-    wait for completion, then download the generated output file.
+    Connect to all servers in parallel, run the get_ceph_info.sh script on each,
+    wait for completion, then download the generated output files.
+    on_prompts_done, if given, is called once the passwords have been read.
     """
     # Create output directory if it doesn't exist
     output_dir = Path('output')
@@ -100,10 +399,12 @@ def execute_remote_script_and_fetch_output(config):
     username = config['ssh']['username']
     key_file = os.path.expanduser(config['ssh']['key_file'])
     remote_script_path = config['paths']['remote_script_path']
+    script_dir = os.path.dirname(remote_script_path)
+    script_name = os.path.basename(remote_script_path)
     
     # Check if key file exists
     if not os.path.exists(key_file):
-        print(f"Error: SSH key file {key_file} not found.")
+        logger.error("Error: SSH key file %s not found.", key_file)
         sys.exit(1)
     
     # Get key password ONCE if needed
@@ -114,191 +415,42 @@ def execute_remote_script_and_fetch_output(config):
     # Get sudo password ONCE (will be needed for running the script with sudo)
     sudo_password = getpass.getpass("Enter sudo password for remote servers: ")
     
-    # Setup SSH client
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    # Load private key ONCE and share it between the workers
+    private_key = _load_private_key(key_file, key_password)
+    
+    if on_prompts_done is not None:
+        on_prompts_done()
     
     servers_successful = 0
     servers_failed = 0
     
-    # Connect to each server, run the script, and download the output file
-    for server_name, server_ip in config['servers'].items():
-        try:
-            print(f"Connecting to {server_name} ({server_ip})...")
-            
-            # Load private key - determine key type and use appropriate loader
-            try:
-                # Try to load the key and determine its type automatically
-                private_key = paramiko.Ed25519Key.from_private_key_file(key_file, password=key_password)
-            except paramiko.ssh_exception.SSHException:
-                try:
-                    private_key = paramiko.RSAKey.from_private_key_file(key_file, password=key_password)
-                except paramiko.ssh_exception.SSHException:
-                    try:
-                        private_key = paramiko.ECDSAKey.from_private_key_file(key_file, password=key_password)
-                    except paramiko.ssh_exception.SSHException:
-                        try:
-                            private_key = paramiko.DSSKey.from_private_key_file(key_file, password=key_password)
-                        except paramiko.ssh_exception.SSHException:
-                            print(f"Error: Unable to determine the type of the SSH key {key_file} or key is invalid.")
-                            sys.exit(1)
-                        
-            try:
-                ssh.connect(server_ip, username=username, pkey=private_key, timeout=10)
-                print(f"Successfully connected to {server_name}")
-            except paramiko.ssh_exception.PasswordRequiredException:
-                print(f"Error: SSH key requires a password. Please set key_requires_password=true in config.")
-                sys.exit(1)
-            except Exception as e:
-                print(f"Error connecting to {server_name} ({server_ip}): {str(e)}")
-                servers_failed += 1
-                continue
-            
-            # Get an interactive session for handling sudo
-            channel = ssh.invoke_shell()
-            
-            # Set terminal dimensions to avoid wrapping issues
-            channel.resize_pty(width=200, height=50)
-            
-            # Wait for initial prompt
-            print("Waiting for shell prompt...")
-            output = wait_for_prompt(channel)
-            if not output:
-                print(f"Error: Failed to get shell prompt from {server_name}")
-                servers_failed += 1
-                continue
-                
-            print("Shell prompt received, proceeding...")
-            
-            # Navigate to the directory containing the script
-            script_dir = os.path.dirname(remote_script_path)
-            script_name = os.path.basename(remote_script_path)
-            
-            if script_dir:
-                print(f"Changing to directory: {script_dir}")
-                channel.send(f"cd {script_dir}\n")
-                # Wait for completion
-                output = wait_for_prompt(channel)
-                if not output:
-                    print(f"Error: Failed to change directory on {server_name}")
-                    servers_failed += 1
-                    continue
-            
-            # Make the script executable
-            print("Making script executable...")
-            channel.send(f"chmod +x {script_name}\n")
-            # Wait for completion
-            output = wait_for_prompt(channel)
-            if not output:
-                print(f"Error: Failed to make script executable on {server_name}")
-                servers_failed += 1
-                continue
-            
-            # Run the script with sudo
-            print(f"Running get_ceph_info.sh on {server_name} with sudo (this may take several minutes)...")
-            channel.send(f"sudo ./{script_name}\n")
-            
-            # Handle sudo password prompt
-            output = b''
-            sudo_prompted = False
-            script_completed = False
-            start_time = time.time()
-            
-            # Wait for sudo password prompt or completion with timeout
-            max_wait_time = 600  # 10 minutes max wait
-            
-            while not script_completed and (time.time() - start_time) < max_wait_time:
-                if channel.recv_ready():
-                    chunk = channel.recv(1024)
-                    print(f"Debug - received chunk: {chunk[:50]}...") # Show first 50 bytes
-                    output += chunk
-                    
-                    # Check for sudo password prompt
-                    if (b'password for' in output.lower() or b'password:' in output.lower()) and not sudo_prompted:
-                        print("Sending sudo password...")
-                        channel.send(sudo_password + '\n')
-                        sudo_prompted = True
-                    
-                    # Check if script has completed
-                    if b'Results saved to' in output or b'ceph-mapping.md' in output or b'ceph-details-output' in output:
-                        script_completed = True
-                        print(f"Script execution completed on {server_name}")
-                        break
-                
-                time.sleep(0.5)
-            
-            if not script_completed:
-                print(f"Error: Script execution timed out on {server_name} after {max_wait_time} seconds")
-                print(f"Last output: {output}")
-                servers_failed += 1
-                continue
-            
-            # Now download the output file using SFTP
-            sftp = ssh.open_sftp()
-            
-            # Look for output file with more flexible naming
-            print("Searching for output file...")
-            
-            # Check script directory for output files
-            output_patterns = [
-                "ceph-mapping.md", 
-                "ceph-details-output*.md"
-            ]
-            
-            found_output_file = False
-            remote_output_path = None
-            
-            for pattern in output_patterns:
-                try:
-                    if script_dir:
-                        cmd = f"find {script_dir} -name '{pattern}' -type f -mmin -10 | sort -r | head -1"
-                    else:
-                        cmd = f"find . -name '{pattern}' -type f -mmin -10 | sort -r | head -1"
-                        
-                    stdin, stdout, stderr = ssh.exec_command(cmd)
-                    found_files = stdout.read().decode().strip().split('\n')
-                    
-                    if found_files and found_files[0]:
-                        remote_output_path = found_files[0]
-                        found_output_file = True
-                        print(f"Found output file: {remote_output_path}")
-                        break
-                except Exception as e:
-                    print(f"Error searching for output file pattern {pattern}: {str(e)}")
-            
-            if not found_output_file:
-                print(f"Error: Could not find output file on {server_name}")
-                servers_failed += 1
-                continue
-                
-            local_file = output_dir / f"ceph-details-output-{server_name}.md"
-            
-            try:
-                # Give the file system a moment to finish writing
-                time.sleep(1)
-                print(f"Downloading output file to {local_file}...")
-                sftp.get(remote_output_path, local_file)
-                print(f"Download complete!")
+    # Process the servers concurrently: connect, run the script, and download the output file
+    servers = list(config['servers'].items())
+    _CANCELLED.clear()
+    # Not used as a context manager: its exit would wait for every running worker,
+    # which could take minutes after an interrupt
+    executor = ThreadPoolExecutor(max_workers=min(len(servers), 16))
+    try:
+        futures = [
+            executor.submit(_process_server, server_name, server_ip, username, private_key,
+                            sudo_password, script_dir, script_name, output_dir)
+            for server_name, server_ip in servers
+        ]
+        
+        for future in as_completed(futures):
+            server_name, success, error = future.result()
+            if success:
                 servers_successful += 1
-            except FileNotFoundError:
-                print(f"Error: Output file not found on {server_name}. Check if the script generated ceph-mapping.md.")
-                servers_failed += 1
-            except Exception as e:
-                print(f"Error downloading output file from {server_name}: {str(e)}")
+            else:
+                logger.error(error)
                 servers_failed += 1
-            
-            # Close connections
-            channel.close()
-            sftp.close()
-            ssh.close()
-            
-        except Exception as e:
-            print(f"Unexpected error with {server_name}: {str(e)}")
-            servers_failed += 1
-            try:
-                ssh.close()
-            except:
-                pass
+    except KeyboardInterrupt:
+        logger.error("Interrupted, closing the server connections...")
+        # Closing the clients makes the blocked workers return promptly
+        _close_active_clients()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
     
     # Securely delete password variables from memory
     del sudo_password
@@ -306,25 +458,31 @@ def execute_remote_script_and_fetch_output(config):
         del key_password
     
     # Print summary
-    print(f"\nSummary: Successfully processed {servers_successful} servers, failed for {servers_failed} servers.")
+    logger.info("Summary: Successfully processed %d servers, failed for %d servers.", servers_successful, servers_failed)
     if servers_successful > 0:
-        print(f"Output files are available in the '{output_dir}' directory.")
+        logger.info("Output files are available in the '%s' directory.", output_dir)
 
-def main():
-    """Main function."""
-    # Default config file path
-    config_path = 'config.conf'
+def main(config_path=None, on_prompts_done=None):
+    """Main function. Exits through sys.exit on errors."""
+    # One handler serializes the progress lines of the concurrent workers
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(message)s")
+    # paramiko logs every connection and channel at INFO
+    logging.getLogger("paramiko").setLevel(logging.WARNING)
     
-    # Allow overriding config path from command line
-    if len(sys.argv) > 1:
-        config_path = sys.argv[1]
+    if config_path is None:
+        # Default config file path
+        config_path = 'config.conf'
+        
+        # Allow overriding config path from command line
+        if len(sys.argv) > 1:
+            config_path = sys.argv[1]
     
     # Read and validate config
     config = read_config(config_path)
     validate_config(config)
     
     # Execute remote script and fetch output
-    execute_remote_script_and_fetch_output(config)
+    execute_remote_script_and_fetch_output(config, on_prompts_done)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,88 +1,206 @@
 #!/usr/bin/env python3
 """
 Launcher script for Ceph Dashboard
-1. Fetches data from Ceph servers
-2. Launches the web app to display the data
+1. Launches the web app to display the data
+2. Fetches data from Ceph servers while the web app is already running
 """
 
 import os
 import sys
-import subprocess
+import multiprocessing
 import webbrowser
 import socket
 import time
+import http.client
 import threading
+import logging
 import configparser
 
+# Marker file in the output directory, present while a fetch is running and
+# holding the launcher's PID; the web app reports it through its /status endpoint
+FETCH_MARKER_FILE = os.path.join('output', '.fetch-in-progress')
+
+# Rule above and below the step banners
+RULE = "=" * 60
+
+# Parsed config files: path -> ((mtime_ns, size, inode), config), with a
+# signature of None for a missing file
+_CONFIG_CACHE = {}
+_CONFIG_CACHE_LOCK = threading.Lock()
+
 def read_config():
-    """Read configuration file and return config object."""
-    config = configparser.ConfigParser()
+    """
+    Read configuration file and return config object, cached until the file
+    changes. Callers must not modify the returned object.
+    """
     config_path = os.path.join(os.path.dirname(__file__), 'config.conf')
+    try:
+        st = os.stat(config_path)
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        signature = None
     
-    if os.path.exists(config_path):
-        config.read(config_path)
-    else:
-        print(f"Warning: Config file {config_path} not found. Using defaults.")
-        # Create app section with defaults if not present
-        if 'app' not in config:
-            config['app'] = {}
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE.get(config_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
         
-    return config
+        config = configparser.ConfigParser()
+        if signature is not None:
+            config.read(config_path)
+        else:
+            print(f"Warning: Config file {config_path} not found. Using defaults.")
+            # Create app section with defaults if not present
+            if 'app' not in config:
+                config['app'] = {}
+        
+        _CONFIG_CACHE[config_path] = (signature, config)
+        return config
 
-def get_free_port():
-    """Find a free port on the system to run the app."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(('', 0))
-        return s.getsockname()[1]
+def load_app_settings():
+    """Return the [app] settings as a plain dict of port, host and debug."""
+    config = read_config()
+    return {
+        'port': config.getint('app', 'port', fallback=54321),
+        'host': config.get('app', 'host', fallback='0.0.0.0'),
+        'debug': config.getboolean('app', 'debug', fallback=True),
+    }
 
-def fetch_data():
-    """Run the data fetching script."""
-    print("=" * 60)
-    print("Step 1: Fetching Ceph cluster data from servers...")
-    print("=" * 60)
+def bind_app_socket(host, port):
+    """
+    Bind and listen on the socket the web app will serve from, on the requested
+    port or on a free one if it is in use. The socket is handed to the app, so
+    the port cannot be taken between checking it and the app starting.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    # Allow rebinding a port left in TIME_WAIT by a previous run
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind((host, port))
+    except OSError:
+        print(f"Warning: Port {port} is already in use.")
+        sock.bind((host, 0))
+        print(f"Using alternative port: {sock.getsockname()[1]}")
+    sock.listen(128)
+    sock.set_inheritable(True)
+    return sock
+
+def _primary_ip():
+    """
+    Return the address of the interface used for outbound traffic, or 127.0.0.1.
+    Connecting a UDP socket sends nothing and needs no DNS lookup, unlike
+    resolving the host name, which can block and often returns 127.0.1.1 on Debian.
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            # Any address will do, it only has to be routable; a private one
+            # picks the interface LAN clients would reach
+            s.connect(('10.255.255.255', 1))
+            return s.getsockname()[0]
+    except OSError:
+        return '127.0.0.1'
+
+def fetch_data(on_prompts_done=None):
+    """Run the data fetching script. on_prompts_done is called once the passwords have been read."""
+    sys.stdout.write(f"\n{RULE}\nStep 2: Fetching Ceph cluster data from servers...\n{RULE}\n")
+    
+    # Let the web app show that data is still loading
+    os.makedirs(os.path.dirname(FETCH_MARKER_FILE), exist_ok=True)
+    with open(FETCH_MARKER_FILE, 'w') as f:
+        f.write(str(os.getpid()))
     
     try:
-        # Run fetch_ceph_data.py and wait for it to complete
-        subprocess.run([sys.executable, "fetch_ceph_data.py"], check=True)
-        print("\nData collection completed successfully.")
-        return True
-    except subprocess.CalledProcessError:
-        print("\nError: Failed to fetch data from servers.")
+        # Imported here so that a missing dependency such as paramiko only fails
+        # this step, and the dashboard can still be used
+        import fetch_ceph_data
+        
+        # Run the fetch in this process rather than starting another interpreter.
+        # The config path is passed explicitly, as our own arguments hold the port
+        fetch_ceph_data.main('config.conf', on_prompts_done)
+    except SystemExit as e:
+        # fetch_ceph_data reports its errors through sys.exit
+        if e.code not in (0, None):
+            print("\nError: Failed to fetch data from servers.")
+            return False
+    except ImportError as e:
+        print(f"\nError: Unable to load fetch_ceph_data.py: {e}")
         return False
-    except FileNotFoundError:
-        print("\nError: fetch_ceph_data.py not found in the current directory.")
+    except Exception as e:
+        print(f"\nError: Failed to fetch data from servers: {e}")
         return False
+    finally:
+        try:
+            os.remove(FETCH_MARKER_FILE)
+        except FileNotFoundError:
+            pass
+    
+    print("\nData collection completed successfully.")
+    return True
 
-def launch_webapp(port, host, debug):
-    """Launch the Flask web app on the specified port."""
-    env = os.environ.copy()
-    env["FLASK_APP"] = "app.py"
-    
-    # Start Flask app with the specified port and host
-    cmd = [sys.executable, "-m", "flask", "run", f"--host={host}", f"--port={port}"]
-    if debug:
-        env["FLASK_DEBUG"] = "1"
-        
-    process = subprocess.Popen(cmd, env=env)
+def _serve_webapp(sock, host, debug):
+    """Web app process: serve the Flask app from the socket bound by the launcher."""
+    # Werkzeug serves from an inherited socket when it believes it runs under its
+    # own reloader, so it does not bind the port again. The launcher owns the
+    # socket, hence the code reloader is disabled
+    os.environ["WERKZEUG_RUN_MAIN"] = "true"
+    os.environ["WERKZEUG_SERVER_FD"] = str(sock.fileno())
+    
+    # The pages poll /status while data is being fetched; keep those requests
+    # out of the terminal the fetch is writing to
+    logging.getLogger('werkzeug').addFilter(lambda record: '/status' not in record.getMessage())
+    
+    from app import app
+    app.run(host=host, port=sock.getsockname()[1], debug=debug, use_reloader=False)
+
+def launch_webapp(sock, host, debug):
+    """
+    Launch the Flask web app serving on the already bound socket, in a child
+    process started from this interpreter instead of through 'flask run'.
+    """
+    process = multiprocessing.Process(target=_serve_webapp, args=(sock, host, debug))
+    process.start()
     return process
 
-def open_browser(url, delay=2):
-    """Open the browser after a short delay to allow the app to start."""
-    def _open_browser():
-        time.sleep(delay)
-        webbrowser.open(url)
-    
-    thread = threading.Thread(target=_open_browser)
+def wait_for_app(process, host, port, timeout=10.0, interval=0.025):
+    """
+    Wait until the web app answers a request. The launcher binds the port before
+    the app starts, so an accepted connection alone does not prove the app is up.
+    Returns False if the app process exits or does not answer within the timeout.
+    """
+    # A wildcard address is reached through the loopback interface
+    if host in ('', '0.0.0.0'):
+        host = '127.0.0.1'
+    deadline = time.monotonic() + timeout
+    while process.is_alive():
+        # The request waits in the backlog until the app accepts it, and fails
+        # at once if the app process exits and the socket closes
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        connection = http.client.HTTPConnection(host, port, timeout=remaining)
+        try:
+            connection.request('GET', '/status')
+            connection.getresponse().read()
+            return True
+        except (OSError, http.client.HTTPException):
+            time.sleep(interval)
+        finally:
+            connection.close()
+    return False
+
+def open_browser(url):
+    """Open the browser without blocking, as some browsers keep webbrowser.open waiting."""
+    thread = threading.Thread(target=webbrowser.open, args=(url,))
     thread.daemon = True
     thread.start()
 
 def main():
     """Main function to orchestrate data fetching and app launching."""
     # Read configuration
-    config = read_config()
-    port = config.getint('app', 'port', fallback=54321)
-    host = config.get('app', 'host', fallback='0.0.0.0')
-    debug = config.getboolean('app', 'debug', fallback=True)
+    settings = load_app_settings()
+    port = settings['port']
+    host = settings['host']
+    debug = settings['debug']
     
     # Check if port is specified via command line (overrides config file)
     if len(sys.argv) > 1 and sys.argv[1].isdigit():
@@ -95,62 +213,73 @@ def main():
         print("Make sure you're running this script from the project directory.")
         return 1
     
-    # Step 1: Fetch data from Ceph servers
-    if not fetch_data():
-        print("Would you like to continue and launch the app anyway? (y/n)")
-        response = input().strip().lower()
-        if response != 'y':
-            return 1
-    
-    # Step 2: Launch the web app
-    print("\n" + "=" * 60)
-    print(f"Step 2: Launching Ceph Dashboard web app on port {port}...")
-    print("=" * 60)
+    # Step 1: Launch the web app. It reads the output files on each request,
+    # so it can start before the data is fetched and show it as it arrives
+    sys.stdout.write(f"{RULE}\nStep 1: Launching Ceph Dashboard web app on port {port}...\n{RULE}\n")
     
-    # Check if the specified port is free, otherwise find a new one
+    # Bind the port now, falling back to a free one if it is in use
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(('127.0.0.1', port))
-    except OSError:
-        print(f"Warning: Port {port} is already in use.")
-        port = get_free_port()
-        print(f"Using alternative port: {port}")
+        sock = bind_app_socket(host, port)
+    except OSError as e:
+        print(f"Error: Unable to listen on {host}: {e}")
+        return 1
+    port = sock.getsockname()[1]
     
     # Construct the URL
-    local_ip = socket.gethostbyname(socket.gethostname())
+    local_ip = _primary_ip()
     urls = [
         f"http://localhost:{port}/",
         f"http://127.0.0.1:{port}/",
         f"http://{local_ip}:{port}/"
     ]
     
-    # Launch the app
-    app_process = launch_webapp(port, host, debug)
+    # Launch the app. The socket already listens, so connections made before
+    # Flask is up wait in the backlog; the app holds its own copy now
+    app_process = launch_webapp(sock, host, debug)
+    sock.close()
     
-    # Check if app is running
-    time.sleep(2)
-    if app_process.poll() is not None:
+    # Check if app is running, waiting only as long as it takes to answer
+    if not wait_for_app(app_process, host, port):
         print("Error: Failed to start the web app.")
+        app_process.terminate()
+        app_process.join()
         return 1
     
-    # Print access URLs
-    print("\nCeph Dashboard is now running!")
-    print("\nYou can access it at:")
-    for url in urls:
-        print(f"  - {url}")
+    # Print access URLs in a single write
+    url_list = "\n".join(f"  - {url}" for url in urls)
+    sys.stdout.write(f"\nCeph Dashboard is now running!\n\nYou can access it at:\n{url_list}\n")
     
-    # Open browser automatically
-    open_browser(urls[0])
+    # Open the browser once, as soon as the fetch no longer needs the terminal
+    # for password prompts
+    browser_opened = threading.Event()
     
-    print("\nPress Ctrl+C to stop the dashboard...")
+    def open_dashboard():
+        if not browser_opened.is_set():
+            browser_opened.set()
+            open_browser(urls[0])
     
     try:
+        # Step 2: Fetch data from Ceph servers while the app is serving
+        if not fetch_data(on_prompts_done=open_dashboard):
+            print("Would you like to keep the dashboard running anyway? (y/n)")
+            response = input().strip().lower()
+            if response != 'y':
+                return 1
+        
+        # Open browser automatically, if the fetch stopped before its prompts
+        open_dashboard()
+        
+        print("\nPress Ctrl+C to stop the dashboard...")
+        
         # Keep the script running until user presses Ctrl+C
-        app_process.wait()
+        app_process.join()
     except KeyboardInterrupt:
         print("\nStopping Ceph Dashboard...")
-        app_process.terminate()
-        app_process.wait()
+    finally:
+        # Never leave the web app running behind, whichever way we exit
+        if app_process.is_alive():
+            app_process.terminate()
+        app_process.join()
         print("Dashboard stopped.")
     
     return 0